@@ -1,7 +1,10 @@
+from functools import lru_cache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.core.config import settings
 from app.core.security import verify_token
+from app.services.ai_moderation.cache import ModerationCache
+from app.services.ai_moderation.language import LanguageDetector
 from app.services.ai_moderation.moderator import ContentModerator
 from app.services.blockchain.manager import BlockchainManager
 
@@ -20,13 +23,45 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
     return username
 
 
+def get_current_admin(current_user: str = Depends(get_current_user)) -> str:
+    admin_users = [user.strip() for user in settings.ADMIN_USERS.split(",")]
+    if not current_user or current_user not in admin_users:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    return current_user
+
+
+@lru_cache()
 def get_moderator() -> ContentModerator:
-    return ContentModerator(settings.MODEL_PATH, settings.CONFIDENCE_THRESHOLD)
+    language_detector = None
+    if settings.LANGUAGE_MODEL_PATHS:
+        language_detector = LanguageDetector(
+            settings.LANGUAGE_ID_MODEL_PATH, settings.LANGUAGE_MIN_CONFIDENCE
+        )
+    return ContentModerator(
+        settings.MODEL_PATH,
+        settings.CONFIDENCE_THRESHOLD,
+        language_model_paths=settings.LANGUAGE_MODEL_PATHS,
+        language_detector=language_detector,
+        memory_budget_mb=settings.MODEL_MEMORY_BUDGET_MB,
+        encoding_cache_mb=settings.TOKENIZATION_CACHE_MB,
+        batch_size=settings.TEXT_BATCH_SIZE,
+    )
+
+
+@lru_cache()
+def get_moderation_cache() -> ModerationCache:
+    return ModerationCache(settings.MODERATION_CACHE_SIZE)
 
 
+@lru_cache()
 def get_blockchain_manager() -> BlockchainManager:
     return BlockchainManager(
         settings.BLOCKCHAIN_PROVIDER_URL,
         settings.SMART_CONTRACT_ADDRESS,
         "contract_abi.json",
+        confirmation_depth=settings.RECEIPT_CONFIRMATION_DEPTH,
+        max_concurrency=settings.VERIFY_MAX_CONCURRENCY,
     )
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+import os
+
+from app.api.deps import get_current_admin
+from app.core.config import settings
+from app.utils.profiler import SamplingProfiler, format_collapsed
+
+router = APIRouter()
+
+profiler = SamplingProfiler(settings.PROFILER_INTERVAL)
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    duration: float = Query(10.0, gt=0),
+    include_idle: bool = Query(False),
+    current_user: str = Depends(get_current_admin),
+):
+    if duration > settings.PROFILER_MAX_DURATION:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Duration must not exceed {settings.PROFILER_MAX_DURATION}s",
+        )
+    if profiler.busy:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    # Wall-clock profile of every thread. Sampling runs in a worker thread so
+    # the event loop keeps serving (and is itself sampled) meanwhile; threads
+    # idling in select or waiting for work are left out unless include_idle
+    try:
+        counts = await run_in_threadpool(profiler.profile, duration, include_idle)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    filename = f"profile-{os.getpid()}.folded"
+    return PlainTextResponse(
+        format_collapsed(counts),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 import hashlib
+import logging
 import tempfile
 import os
 from typing import List
@@ -9,13 +11,41 @@ from app.models.schemas import (
     ModerationResponse,
     ModerationHistory,
     ModerationResult,
+    VerificationRequest,
+    VerificationResult,
 )
-from app.api.deps import get_current_user, get_moderator, get_blockchain_manager
+from app.core.config import settings
+from app.api.deps import (
+    get_current_user,
+    get_moderator,
+    get_moderation_cache,
+    get_blockchain_manager,
+)
+from app.services.ai_moderation.cache import ModerationCache
 from app.services.ai_moderation.moderator import ContentModerator
 from app.services.blockchain.manager import BlockchainManager
+from app.utils.tracing import trace_stage
+from app.utils.uploads import stream_upload
 
 router = APIRouter()
 
+# The image endpoint reads its multipart body itself instead of declaring a
+# File parameter, so the request body is documented by hand
+IMAGE_UPLOAD_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
 
 @router.post("/text", response_model=ModerationResponse)
 async def moderate_text(
@@ -32,11 +62,12 @@ async def moderate_text(
         moderation_result = moderator.moderate_text(request.content)
 
         # Store result on blockchain
-        tx_hash = blockchain.store_moderation_result(
-            content_hash,
-            moderation_result,
-            "0x0",  # Replace with actual moderator address
-        )
+        with trace_stage("blockchain_store"):
+            tx_hash = blockchain.store_moderation_result(
+                content_hash,
+                moderation_result,
+                "0x0",  # Replace with actual moderator address
+            )
 
         return ModerationResponse(
             content_hash=content_hash,
@@ -47,43 +78,61 @@ async def moderate_text(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/image", response_model=ModerationResponse)
+@router.post(
+    "/image", response_model=ModerationResponse, openapi_extra=IMAGE_UPLOAD_SCHEMA
+)
 async def moderate_image(
-    file: UploadFile = File(...),
+    request: Request,
     current_user: str = Depends(get_current_user),
     moderator: ContentModerator = Depends(get_moderator),
     blockchain: BlockchainManager = Depends(get_blockchain_manager),
+    cache: ModerationCache = Depends(get_moderation_cache),
 ):
+    temp_file_path = None
     try:
-        # Save uploaded file temporarily
+        # Stream the upload to a temporary file, hashing it as bytes arrive
         with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
             temp_file_path = temp_file.name
+            with trace_stage("upload"):
+                content_hash = await stream_upload(
+                    request, "file", temp_file, settings.MAX_UPLOAD_SIZE
+                )
 
-        # Generate content hash
-        content_hash = hashlib.sha256(content).hexdigest()
+        # Answer repeat uploads before any image decoding happens
+        cached = cache.get(content_hash)
+        if cached is not None:
+            moderation_result, tx_hash = cached
+            return ModerationResponse(
+                content_hash=content_hash,
+                moderation_result=moderation_result,
+                blockchain_transaction=tx_hash,
+            )
 
         # Perform AI moderation
         moderation_result = moderator.moderate_image(temp_file_path)
 
-        # Clean up temporary file
-        os.unlink(temp_file_path)
-
         # Store result on blockchain
-        tx_hash = blockchain.store_moderation_result(
-            content_hash,
-            moderation_result,
-            "0x0",  # Replace with actual moderator address
-        )
+        with trace_stage("blockchain_store"):
+            tx_hash = blockchain.store_moderation_result(
+                content_hash,
+                moderation_result,
+                "0x0",  # Replace with actual moderator address
+            )
+        cache.put(content_hash, moderation_result, tx_hash)
 
         return ModerationResponse(
             content_hash=content_hash,
             moderation_result=moderation_result,
             blockchain_transaction=tx_hash,
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Clean up temporary file
+        if temp_file_path is not None:
+            os.unlink(temp_file_path)
 
 
 @router.get("/history/{content_hash}", response_model=ModerationHistory)
@@ -106,13 +155,26 @@ async def batch_moderate(
     moderator: ContentModerator = Depends(get_moderator),
     blockchain: BlockchainManager = Depends(get_blockchain_manager),
 ):
+    # Moderate all texts in one call so they are classified in padded batches.
+    # If the batch fails, fall back to one call per text so a single bad
+    # input only fails its own item.
+    texts = [request.content for request in requests if request.content_type == "text"]
+    try:
+        text_results = iter(moderator.moderate_texts(texts))
+    except Exception as e:
+        logging.warning(f"Batch text moderation failed, retrying per item: {str(e)}")
+        text_results = None
+
     responses = []
     for request in requests:
         try:
             content_hash = hashlib.sha256(request.content.encode()).hexdigest()
 
             if request.content_type == "text":
-                moderation_result = moderator.moderate_text(request.content)
+                if text_results is not None:
+                    moderation_result = next(text_results)
+                else:
+                    moderation_result = moderator.moderate_text(request.content)
             else:
                 raise HTTPException(
                     status_code=400,
@@ -136,3 +198,46 @@ async def batch_moderate(
             responses.append({"error": str(e)})
 
     return responses
+
+
+@router.get("/models/metrics")
+async def get_model_metrics(
+    current_user: str = Depends(get_current_user),
+    moderator: ContentModerator = Depends(get_moderator),
+):
+    return {
+        "memory_budget_bytes": moderator.text_models.memory_budget_bytes,
+        "resident_bytes": moderator.text_models.resident_bytes(),
+        "models": moderator.text_models.metrics(),
+    }
+
+
+@router.post("/verify/batch", response_model=List[VerificationResult])
+async def batch_verify(
+    requests: List[VerificationRequest],
+    current_user: str = Depends(get_current_user),
+    blockchain: BlockchainManager = Depends(get_blockchain_manager),
+):
+    if len(requests) > settings.VERIFY_MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.VERIFY_MAX_BATCH_SIZE} records per batch",
+        )
+
+    # Receipt lookups block on RPC calls, keep them off the event loop
+    statuses = await run_in_threadpool(
+        blockchain.verify_moderations,
+        [(request.content_hash, request.transaction_hash) for request in requests],
+    )
+    results = []
+    for request in requests:
+        verified, error = statuses[blockchain.normalize_hash(request.transaction_hash)]
+        results.append(
+            VerificationResult(
+                content_hash=request.content_hash,
+                transaction_hash=request.transaction_hash,
+                verified=verified,
+                error=error,
+            )
+        )
+    return results
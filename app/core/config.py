@@ -1,7 +1,8 @@
 from pydantic import BaseSettings
 from dotenv import load_dotenv
+import json
 import os
-from typing import Optional
+from typing import Dict, Optional
 
 load_dotenv()
 
@@ -16,6 +17,9 @@ class Settings(BaseSettings):
         "BLOCKCHAIN_PROVIDER_URL", "http://localhost:8545"
     )
     SMART_CONTRACT_ADDRESS: str = os.getenv("SMART_CONTRACT_ADDRESS", "")
+    RECEIPT_CONFIRMATION_DEPTH: int = int(os.getenv("RECEIPT_CONFIRMATION_DEPTH", "12"))
+    VERIFY_MAX_CONCURRENCY: int = int(os.getenv("VERIFY_MAX_CONCURRENCY", "16"))
+    VERIFY_MAX_BATCH_SIZE: int = int(os.getenv("VERIFY_MAX_BATCH_SIZE", "5000"))
 
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./content_moderation.db")
@@ -23,11 +27,44 @@ class Settings(BaseSettings):
     # AI Model settings
     MODEL_PATH: str = os.getenv("MODEL_PATH", "models/content_moderation")
     CONFIDENCE_THRESHOLD: float = float(os.getenv("CONFIDENCE_THRESHOLD", "0.8"))
+    # JSON object mapping ISO 639-1 codes to text models, e.g. {"de": "..."};
+    # other languages use MODEL_PATH
+    LANGUAGE_MODEL_PATHS: Dict[str, str] = json.loads(
+        os.getenv("LANGUAGE_MODEL_PATHS", "{}")
+    )
+    LANGUAGE_ID_MODEL_PATH: str = os.getenv(
+        "LANGUAGE_ID_MODEL_PATH", "models/lid.176.ftz"
+    )
+    LANGUAGE_MIN_CONFIDENCE: float = float(os.getenv("LANGUAGE_MIN_CONFIDENCE", "0.5"))
+    # Upper bound on resident text model weights per worker
+    MODEL_MEMORY_BUDGET_MB: int = int(os.getenv("MODEL_MEMORY_BUDGET_MB", "4096"))
+    # Per-worker bound on cached token ids, outside MODEL_MEMORY_BUDGET_MB
+    TOKENIZATION_CACHE_MB: int = int(os.getenv("TOKENIZATION_CACHE_MB", "64"))
+    TEXT_BATCH_SIZE: int = int(os.getenv("TEXT_BATCH_SIZE", "32"))
+    MODERATION_CACHE_SIZE: int = int(os.getenv("MODERATION_CACHE_SIZE", "10000"))
+
+    # Upload settings
+    MAX_UPLOAD_SIZE: int = int(os.getenv("MAX_UPLOAD_SIZE", str(10 * 1024 * 1024)))
 
     # Security settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Comma separated usernames allowed to use the admin endpoints; empty
+    # denies admin access to everyone
+    ADMIN_USERS: str = os.getenv("ADMIN_USERS", "")
+
+    # Profiler settings
+    PROFILER_INTERVAL: float = float(os.getenv("PROFILER_INTERVAL", "0.01"))
+    PROFILER_MAX_DURATION: float = float(os.getenv("PROFILER_MAX_DURATION", "60"))
+
+    # Server settings
+    HOST: str = os.getenv("HOST", "0.0.0.0")
+    PORT: int = int(os.getenv("PORT", "8000"))
+    WORKERS: int = int(os.getenv("WORKERS", "1"))
+    WORKER_RESPAWN_DELAY: float = float(os.getenv("WORKER_RESPAWN_DELAY", "1"))
+    WORKER_RESPAWN_MAX_DELAY: float = float(os.getenv("WORKER_RESPAWN_MAX_DELAY", "60"))
+    MEMORY_REPORT_INTERVAL: int = int(os.getenv("MEMORY_REPORT_INTERVAL", "60"))
 
     # CORS settings
     BACKEND_CORS_ORIGINS: list = ["*"]
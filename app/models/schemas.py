@@ -40,6 +40,7 @@ class ModerationResult(BaseModel):
     category: str
     confidence: float
     is_flagged: bool
+    language: Optional[str] = None
     text_analysis: Optional[Dict[str, Any]] = None
 
 
@@ -53,3 +54,15 @@ class ModerationResponse(BaseModel):
 class ModerationHistory(BaseModel):
     content_hash: str
     history: List[ModerationResult]
+
+
+class VerificationRequest(BaseModel):
+    content_hash: str
+    transaction_hash: str
+
+
+class VerificationResult(BaseModel):
+    content_hash: str
+    transaction_hash: str
+    verified: bool
+    error: Optional[str] = None
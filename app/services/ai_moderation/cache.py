@@ -0,0 +1,34 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Tuple
+from app.models.schemas import ModerationResult
+
+
+class ModerationCache:
+    # Bounded LRU of content hash -> (moderation result, blockchain transaction)
+    # so content that was already moderated is not decoded or classified again
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[ModerationResult, str]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, content_hash: str) -> Optional[Tuple[ModerationResult, str]]:
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            if entry is not None:
+                self._entries.move_to_end(content_hash)
+            return entry
+
+    def put(
+        self, content_hash: str, moderation_result: ModerationResult, tx_hash: str
+    ) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[content_hash] = (moderation_result, tx_hash)
+            self._entries.move_to_end(content_hash)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
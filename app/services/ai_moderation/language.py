@@ -0,0 +1,17 @@
+import fasttext
+from typing import Optional
+
+
+class LanguageDetector:
+    # fastText language identification (lid.176) runs in microseconds per
+    # text, cheap enough to sit in front of every moderation call
+    def __init__(self, model_path: str, min_confidence: float = 0.5):
+        self.min_confidence = min_confidence
+        self.model = fasttext.load_model(model_path)
+
+    def detect(self, text: str) -> Optional[str]:
+        # fastText predicts on a single line
+        labels, scores = self.model.predict(text.replace("\n", " "), k=1)
+        if not labels or scores[0] < self.min_confidence:
+            return None
+        return labels[0].replace("__label__", "")
@@ -0,0 +1,122 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Optional
+import logging
+import time
+
+
+class ModelPool:
+    # Lazily loads text classification pipelines keyed by model path and keeps
+    # the most recently used ones resident within a memory budget, evicting
+    # the least recently used pipeline when a new load would exceed it.
+    # Pinned models (the default model, preloaded in the master and shared
+    # copy-on-write with the workers) are never evicted and do not count
+    # against the budget: evicting them frees nothing while the master holds
+    # the pages, and reloading them would create a private copy per worker.
+    def __init__(
+        self,
+        loader: Callable[[str], Any],
+        memory_budget_bytes: int,
+        pinned: Iterable[str] = (),
+    ):
+        self.loader = loader
+        self.memory_budget_bytes = memory_budget_bytes
+        self.pinned = frozenset(pinned)
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._metrics: Dict[str, Dict[str, float]] = {}
+        self._lock = Lock()
+        self._load_locks: Dict[str, Lock] = {}
+
+    @staticmethod
+    def estimate_size(model_pipeline: Any) -> int:
+        model = model_pipeline.model
+        if hasattr(model, "get_memory_footprint"):
+            return int(model.get_memory_footprint())
+        # TensorFlow models expose no footprint helper, assume float32 weights
+        return int(model.count_params()) * 4
+
+    def _metrics_for(self, model_path: str) -> Dict[str, float]:
+        return self._metrics.setdefault(
+            model_path,
+            {"hits": 0, "loads": 0, "evictions": 0, "load_seconds": 0.0},
+        )
+
+    def _lookup(self, model_path: str) -> Optional[Any]:
+        model_pipeline = self._models.get(model_path)
+        if model_pipeline is not None:
+            self._models.move_to_end(model_path)
+            self._metrics_for(model_path)["hits"] += 1
+        return model_pipeline
+
+    def get(self, model_path: str) -> Any:
+        with self._lock:
+            model_pipeline = self._lookup(model_path)
+            if model_pipeline is not None:
+                return model_pipeline
+            load_lock = self._load_locks.setdefault(model_path, Lock())
+
+        # Only requests for the same model wait on each other while it loads
+        with load_lock:
+            with self._lock:
+                model_pipeline = self._lookup(model_path)
+                if model_pipeline is not None:
+                    return model_pipeline
+
+            started = time.perf_counter()
+            model_pipeline = self.loader(model_path)
+            elapsed = time.perf_counter() - started
+            size = self.estimate_size(model_pipeline)
+
+            with self._lock:
+                metrics = self._metrics_for(model_path)
+                metrics["loads"] += 1
+                metrics["load_seconds"] += elapsed
+                self._models[model_path] = model_pipeline
+                self._sizes[model_path] = size
+                self._evict(keep=model_path)
+            logging.info(
+                f"Loaded model {model_path} ({size / 2**20:.0f} MiB) "
+                f"in {elapsed:.2f}s"
+            )
+            return model_pipeline
+
+    def _evict(self, keep: str) -> None:
+        # Callers hold self._lock. The model just loaded is never evicted, even
+        # when it alone exceeds the budget.
+        while self._budgeted_bytes() > self.memory_budget_bytes:
+            victim = next(
+                (
+                    path
+                    for path in self._models
+                    if path != keep and path not in self.pinned
+                ),
+                None,
+            )
+            if victim is None:
+                break
+            del self._models[victim]
+            size = self._sizes.pop(victim)
+            self._metrics_for(victim)["evictions"] += 1
+            logging.info(f"Evicted model {victim} ({size / 2**20:.0f} MiB)")
+
+    def _budgeted_bytes(self) -> int:
+        return sum(
+            size for path, size in self._sizes.items() if path not in self.pinned
+        )
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                model_path: {
+                    **metrics,
+                    "resident": model_path in self._models,
+                    "pinned": model_path in self.pinned,
+                    "size_bytes": self._sizes.get(model_path, 0),
+                }
+                for model_path, metrics in self._metrics.items()
+            }
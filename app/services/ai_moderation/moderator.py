@@ -3,39 +3,127 @@ from PIL import Image
 import pytesseract
 import cv2
 import numpy as np
-from typing import Dict, Union, List
+from typing import Any, Dict, Union, List, Optional, Tuple
 import logging
+from fastapi import HTTPException
 from app.models.schemas import ModerationResult
+from app.services.ai_moderation.language import LanguageDetector
+from app.services.ai_moderation.model_pool import ModelPool
+from app.services.ai_moderation.preprocessing import (
+    EncodingCache,
+    collate,
+    normalize_text,
+)
+from app.utils.tracing import trace_stage
 
 
 class ContentModerator:
-    def __init__(self, model_path: str, confidence_threshold: float = 0.8):
+    def __init__(
+        self,
+        model_path: str,
+        confidence_threshold: float = 0.8,
+        language_model_paths: Optional[Dict[str, str]] = None,
+        language_detector: Optional[LanguageDetector] = None,
+        memory_budget_mb: int = 4096,
+        encoding_cache_mb: int = 64,
+        batch_size: int = 32,
+    ):
+        self.model_path = model_path
         self.confidence_threshold = confidence_threshold
-        self.text_classifier = pipeline("text-classification", model=model_path)
-        self.image_classifier = pipeline("image-classification", model=model_path)
+        self.language_model_paths = language_model_paths or {}
+        self.language_detector = language_detector
+        self.text_models = ModelPool(
+            lambda path: pipeline("text-classification", model=path, framework="pt"),
+            memory_budget_mb * 2**20,
+            pinned=[model_path],
+        )
+        self.encodings = EncodingCache(encoding_cache_mb * 2**20)
+        self.batch_size = batch_size
+        self.image_classifier = pipeline(
+            "image-classification", model=model_path, framework="pt"
+        )
         self.categories = ["safe", "hate_speech", "violence", "adult", "harassment"]
 
-    def moderate_text(self, text: str) -> ModerationResult:
-        try:
-            result = self.text_classifier(text)
-            return ModerationResult(
-                content_type="text",
-                category=result[0]["label"],
-                confidence=result[0]["score"],
-                is_flagged=result[0]["score"] > self.confidence_threshold,
+    def warmup(self) -> None:
+        # Run one inference per pipeline so lazily initialised buffers are
+        # allocated before workers are forked from this process
+        self.moderate_text("warmup")
+        self.image_classifier(Image.new("RGB", (224, 224)))
+
+    def route_text(self, text: str) -> Tuple[Optional[str], str]:
+        # Texts in languages without a dedicated model, or that cannot be
+        # identified confidently, fall back to the default model
+        if self.language_detector is None or not self.language_model_paths:
+            return None, self.model_path
+        with trace_stage("language_id"):
+            language = self.language_detector.detect(text)
+        return language, self.language_model_paths.get(language, self.model_path)
+
+    def _classify(self, text_classifier: Any, texts: List[str]) -> List[Dict]:
+        # Run the pipeline's model and postprocessing on cached encodings,
+        # bypassing its tokenization step
+        tokenizer = text_classifier.tokenizer
+        predictions = []
+        for start in range(0, len(texts), self.batch_size):
+            chunk = texts[start : start + self.batch_size]
+            with trace_stage("tokenize"):
+                encodings = [self.encodings.encode(tokenizer, text) for text in chunk]
+                model_inputs = collate(tokenizer, encodings, text_classifier.framework)
+            with trace_stage("text_inference"):
+                logits = text_classifier.forward(model_inputs)["logits"]
+            predictions.extend(
+                text_classifier.postprocess({"logits": logits[i : i + 1]})
+                for i in range(len(chunk))
             )
+        return predictions
+
+    def moderate_texts(self, texts: List[str]) -> List[ModerationResult]:
+        try:
+            with trace_stage("normalize"):
+                canonical = [normalize_text(text) for text in texts]
+
+            # Group texts by the model they are routed to so each model sees
+            # one padded batch per chunk
+            languages: List[Optional[str]] = []
+            groups: Dict[str, List[int]] = {}
+            for index, text in enumerate(canonical):
+                language, model_path = self.route_text(text)
+                languages.append(language)
+                groups.setdefault(model_path, []).append(index)
+
+            results: List[Optional[ModerationResult]] = [None] * len(texts)
+            for model_path, indices in groups.items():
+                with trace_stage("text_model"):
+                    text_classifier = self.text_models.get(model_path)
+                predictions = self._classify(
+                    text_classifier, [canonical[index] for index in indices]
+                )
+                for index, prediction in zip(indices, predictions):
+                    results[index] = ModerationResult(
+                        content_type="text",
+                        category=prediction["label"],
+                        confidence=prediction["score"],
+                        is_flagged=prediction["score"] > self.confidence_threshold,
+                        language=languages[index],
+                    )
+            return results
         except Exception as e:
             logging.error(f"Error in text moderation: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    def moderate_text(self, text: str) -> ModerationResult:
+        return self.moderate_texts([text])[0]
+
     def moderate_image(self, image_path: str) -> ModerationResult:
         try:
-            image = Image.open(image_path)
-            result = self.image_classifier(image)
+            with trace_stage("image_inference"):
+                image = Image.open(image_path)
+                result = self.image_classifier(image)
 
             # Extract text from image for additional analysis
-            img_array = cv2.imread(image_path)
-            extracted_text = pytesseract.image_to_string(img_array)
+            with trace_stage("ocr"):
+                img_array = cv2.imread(image_path)
+                extracted_text = pytesseract.image_to_string(img_array)
 
             text_results = (
                 self.moderate_text(extracted_text) if extracted_text.strip() else None
@@ -0,0 +1,150 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Tuple
+from weakref import WeakKeyDictionary
+import hashlib
+import json
+import re
+import unicodedata
+
+import numpy as np
+from transformers import BatchEncoding
+
+# Invisible characters used to split words without changing how they render
+ZERO_WIDTH = dict.fromkeys(map(ord, "\u00ad\u200b\u200c\u200d\u2060\ufeff"))
+
+# Cyrillic and Greek letters that render like Latin ones. They are only
+# folded inside words that also contain Latin letters, so genuine Cyrillic or
+# Greek text is left for the language specific models.
+CONFUSABLE_SOURCE = "аеорсухіјѕԁАВЕКМНОРСТХІЈЅαοτνκρΑΒΕΗΙΚΜΝΟΡΤΧΥΖ"
+CONFUSABLE_TARGET = "aeopcyxijsdABEKMHOPCTXIJSaotvkpABEHIKMNOPTXYZ"
+CONFUSABLES = str.maketrans(CONFUSABLE_SOURCE, CONFUSABLE_TARGET)
+
+# Approximate per-entry cost of the key, dict and array headers
+ENTRY_OVERHEAD = 512
+
+WORD = re.compile(r"\w+")
+LATIN = re.compile(r"[A-Za-z]")
+
+
+def _fold_confusables(match: "re.Match[str]") -> str:
+    word = match.group(0)
+    if LATIN.search(word) and any(char in CONFUSABLES for char in map(ord, word)):
+        return word.translate(CONFUSABLES)
+    return word
+
+
+def normalize_text(text: str) -> str:
+    # Canonical form used both as the model input and as the cache key, so
+    # visually identical strings share one tokenization
+    text = unicodedata.normalize("NFKC", text).translate(ZERO_WIDTH)
+    text = WORD.sub(_fold_confusables, text)
+    return " ".join(text.split())
+
+
+def tokenizer_fingerprint(tokenizer: Any) -> str:
+    # Identifies what a tokenizer produces rather than where it was loaded
+    # from: a model swapped to another path with the same tokenizer keeps its
+    # cache entries, and a tokenizer replaced in place gets new ones
+    if getattr(tokenizer, "is_fast", False):
+        definition = tokenizer.backend_tokenizer.to_str()
+    else:
+        definition = json.dumps(sorted(tokenizer.get_vocab().items()))
+    digest = hashlib.sha256(definition.encode())
+    digest.update(f"{type(tokenizer).__name__}:{tokenizer.model_max_length}".encode())
+    return digest.hexdigest()
+
+
+class EncodingCache:
+    # LRU of tokenizer outputs keyed by (tokenizer fingerprint, canonical
+    # text) and bounded by the bytes it holds. Token ids are stored as int32
+    # arrays; the attention mask is rebuilt when a batch is collated.
+    def __init__(self, max_bytes: int = 64 * 2**20):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, np.ndarray]]" = (
+            OrderedDict()
+        )
+        self._sizes: Dict[Tuple[str, str], int] = {}
+        self._bytes = 0
+        self._fingerprints: "WeakKeyDictionary[Any, str]" = WeakKeyDictionary()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _fingerprint(self, tokenizer: Any) -> str:
+        # Computed once per loaded tokenizer, a reload gets a new object
+        fingerprint = self._fingerprints.get(tokenizer)
+        if fingerprint is None:
+            fingerprint = tokenizer_fingerprint(tokenizer)
+            self._fingerprints[tokenizer] = fingerprint
+        return fingerprint
+
+    def encode(self, tokenizer: Any, text: str) -> Dict[str, np.ndarray]:
+        key = (self._fingerprint(tokenizer), text)
+        with self._lock:
+            encoding = self._entries.get(key)
+            if encoding is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return encoding
+            self.misses += 1
+
+        encoded = tokenizer(text, truncation=True, return_attention_mask=False)
+        encoding = {
+            name: np.asarray(values, dtype=np.int32) for name, values in encoded.items()
+        }
+        size = (
+            ENTRY_OVERHEAD
+            + len(text)
+            + sum(values.nbytes for values in encoding.values())
+        )
+        if size <= self.max_bytes:
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = encoding
+                    self._sizes[key] = size
+                    self._bytes += size
+                while self._bytes > self.max_bytes:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._bytes -= self._sizes.pop(evicted)
+        return encoding
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+
+def collate(
+    tokenizer: Any, encodings: List[Dict[str, np.ndarray]], framework: str
+) -> BatchEncoding:
+    # Pad cached encodings into one batch the way tokenizer.pad would, without
+    # round-tripping the token ids through Python lists
+    longest = max(len(encoding["input_ids"]) for encoding in encodings)
+    pad_values = {
+        "input_ids": tokenizer.pad_token_id or 0,
+        "token_type_ids": tokenizer.pad_token_type_id,
+    }
+    left = tokenizer.padding_side == "left"
+
+    def place(matrix: np.ndarray, row: int, values: np.ndarray) -> None:
+        if left:
+            matrix[row, longest - len(values) :] = values
+        else:
+            matrix[row, : len(values)] = values
+
+    batch: Dict[str, np.ndarray] = {}
+    for name in tokenizer.model_input_names:
+        matrix = np.full(
+            (len(encodings), longest), pad_values.get(name, 0), dtype=np.int64
+        )
+        for row, encoding in enumerate(encodings):
+            if name == "attention_mask":
+                place(matrix, row, np.ones(len(encoding["input_ids"]), np.int64))
+            elif name in encoding:
+                place(matrix, row, encoding[name])
+        if name == "attention_mask" or name in encodings[0]:
+            batch[name] = matrix
+    return BatchEncoding(batch, tensor_type=framework)
@@ -1,5 +1,7 @@
 from web3 import Web3
-from typing import Dict, Any, List
+from web3.exceptions import TransactionNotFound
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 import json
 import logging
 from fastapi import HTTPException
@@ -8,8 +10,19 @@ from app.models.schemas import ModerationResult
 
 class BlockchainManager:
     def __init__(
-        self, provider_url: str, contract_address: str, contract_abi_path: str
+        self,
+        provider_url: str,
+        contract_address: str,
+        contract_abi_path: str,
+        confirmation_depth: int = 12,
+        max_concurrency: int = 16,
     ):
+        self.confirmation_depth = confirmation_depth
+        self.max_concurrency = max_concurrency
+        # Receipt status keyed by transaction hash. Only receipts buried at
+        # least confirmation_depth blocks deep are stored, since those can no
+        # longer be reorganised away and never need to be fetched again.
+        self._final_receipts: Dict[str, bool] = {}
         try:
             self.web3 = Web3(Web3.HTTPProvider(provider_url))
 
@@ -64,10 +77,88 @@ class BlockchainManager:
                 status_code=500, detail="Failed to retrieve moderation history"
             )
 
+    @staticmethod
+    def normalize_hash(transaction_hash: str) -> str:
+        transaction_hash = transaction_hash.lower()
+        if not transaction_hash.startswith("0x"):
+            transaction_hash = "0x" + transaction_hash
+        return transaction_hash
+
+    def _fetch_receipt(
+        self, transaction_hash: str
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        # Failures are returned per hash so one malformed hash or flaky RPC
+        # call does not fail the other records of a batch
+        try:
+            return self.web3.eth.get_transaction_receipt(transaction_hash), None
+        except TransactionNotFound:
+            return None, None
+        except Exception as e:
+            logging.error(f"Error fetching receipt {transaction_hash}: {str(e)}")
+            return None, str(e)
+
+    def _receipt_status(
+        self,
+        transaction_hash: str,
+        receipt: Optional[Dict[str, Any]],
+        latest_block: Optional[int],
+    ) -> bool:
+        if receipt is None:
+            return False
+        status = receipt["status"] == 1
+        confirmations = latest_block - receipt["blockNumber"] + 1
+        if confirmations >= self.confirmation_depth:
+            self._final_receipts[transaction_hash] = status
+        return status
+
     def verify_moderation(self, content_hash: str, transaction_hash: str) -> bool:
+        results = self.verify_moderations([(content_hash, transaction_hash)])
+        verified, error = results[self.normalize_hash(transaction_hash)]
+        if error is not None:
+            raise HTTPException(status_code=500, detail="Failed to verify moderation")
+        return verified
+
+    def verify_moderations(
+        self, records: List[Tuple[str, str]]
+    ) -> Dict[str, Tuple[bool, Optional[str]]]:
+        # Results map each normalized transaction hash to (verified, error).
+        # Duplicate hashes are fetched once, final receipts are answered from
+        # the cache and the rest are fetched concurrently.
         try:
-            tx_receipt = self.web3.eth.get_transaction_receipt(transaction_hash)
-            return tx_receipt is not None and tx_receipt["status"] == 1
+            results: Dict[str, Tuple[bool, Optional[str]]] = {}
+            pending: List[str] = []
+            for _, transaction_hash in records:
+                key = self.normalize_hash(transaction_hash)
+                if key in results:
+                    continue
+                if key in self._final_receipts:
+                    results[key] = (self._final_receipts[key], None)
+                else:
+                    # Placeholder so later duplicates are skipped
+                    results[key] = (False, None)
+                    pending.append(key)
+
+            if len(pending) == 1:
+                fetched = [self._fetch_receipt(pending[0])]
+            elif pending:
+                workers = min(self.max_concurrency, len(pending))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    fetched = list(executor.map(self._fetch_receipt, pending))
+            else:
+                fetched = []
+
+            # The block height is only needed to judge finality of receipts
+            # that were actually found
+            latest_block = None
+            if any(receipt is not None for receipt, _ in fetched):
+                latest_block = self.web3.eth.block_number
+            for key, (receipt, error) in zip(pending, fetched):
+                results[key] = (
+                    self._receipt_status(key, receipt, latest_block),
+                    error,
+                )
+
+            return results
         except Exception as e:
             logging.error(f"Error verifying moderation: {str(e)}")
             raise HTTPException(status_code=500, detail="Failed to verify moderation")
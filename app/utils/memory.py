@@ -0,0 +1,41 @@
+import resource
+from typing import Dict, Union
+
+# Fields of /proc/<pid>/smaps_rollup that show how much of a worker's
+# resident memory is still shared with the preloading master process
+SMAPS_FIELDS = {
+    "Rss": "rss_kb",
+    "Pss": "pss_kb",
+    "Shared_Clean": "shared_clean_kb",
+    "Shared_Dirty": "shared_dirty_kb",
+    "Private_Clean": "private_clean_kb",
+    "Private_Dirty": "private_dirty_kb",
+}
+
+
+def memory_report(pid: Union[int, str] = "self") -> Dict[str, int]:
+    report: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                parts = line.split()
+                key = parts[0].rstrip(":")
+                if key in SMAPS_FIELDS:
+                    report[SMAPS_FIELDS[key]] = int(parts[1])
+    except OSError:
+        # smaps_rollup is Linux only; fall back to the peak RSS of this process
+        if pid == "self":
+            report["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return report
+
+    report["shared_kb"] = report.get("shared_clean_kb", 0) + report.get(
+        "shared_dirty_kb", 0
+    )
+    report["private_kb"] = report.get("private_clean_kb", 0) + report.get(
+        "private_dirty_kb", 0
+    )
+    return report
+
+
+def format_report(report: Dict[str, int]) -> str:
+    return " ".join(f"{key}={value}" for key, value in sorted(report.items()))
@@ -0,0 +1,84 @@
+from collections import Counter
+from threading import Lock
+from types import FrameType
+from typing import Dict, Optional
+import os
+import sys
+import threading
+import time
+
+# Leaf frames (file, function) of threads parked waiting for work: the event
+# loop blocked in select/epoll and idle thread pool workers waiting on their
+# queue. Samples ending there are dropped unless idle threads are requested.
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+class SamplingProfiler:
+    # Wall-clock stack sampler running in a background thread of the live
+    # process. Each tick only walks the frames of the other threads, so the
+    # cost is bounded by the sampling interval and nothing is instrumented.
+    # Threads blocked in I/O from Python code (RPC calls, file reads) are
+    # still sampled, since that is time requests spend waiting.
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self._running = Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._running.locked()
+
+    def profile(self, duration: float, include_idle: bool = False) -> Dict[str, int]:
+        if not self._running.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            return self._sample(duration, include_idle)
+        finally:
+            self._running.release()
+
+    def _sample(self, duration: float, include_idle: bool) -> Dict[str, int]:
+        own_thread = threading.get_ident()
+        counts: Counter = Counter()
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                if not include_idle and self._is_idle(frame):
+                    continue
+                thread_name = names.get(thread_id, str(thread_id))
+                counts[self._collapse(thread_name, frame)] += 1
+            time.sleep(self.interval)
+        return dict(counts)
+
+    @staticmethod
+    def _is_idle(frame: FrameType) -> bool:
+        code = frame.f_code
+        return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+    @staticmethod
+    def _collapse(thread_name: str, frame: FrameType) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            filename = os.path.basename(code.co_filename)
+            stack.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.append(thread_name)
+        # Collapsed stack format uses ";" as the frame separator
+        return ";".join(name.replace(";", ":") for name in reversed(stack))
+
+
+def format_collapsed(counts: Dict[str, int]) -> str:
+    # One "root;...;leaf count" line per stack, as consumed by flamegraph.pl
+    # and speedscope
+    return "".join(
+        f"{stack} {count}\n"
+        for stack, count in sorted(counts.items(), key=lambda item: -item[1])
+    )
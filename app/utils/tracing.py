@@ -0,0 +1,68 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import time
+
+# Stage timings of the current request, None when the request did not opt in
+_stages: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar(
+    "moderation_stages", default=None
+)
+
+
+def start_trace() -> Tuple[Token, List[Tuple[str, float]]]:
+    stages: List[Tuple[str, float]] = []
+    return _stages.set(stages), stages
+
+
+def stop_trace(token: Token) -> None:
+    _stages.reset(token)
+
+
+@contextmanager
+def trace_stage(name: str) -> Iterator[None]:
+    stages = _stages.get()
+    if stages is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages.append((name, (time.perf_counter() - started) * 1000))
+
+
+def format_server_timing(stages: List[Tuple[str, float]]) -> str:
+    return ", ".join(f"{name};dur={duration:.2f}" for name, duration in stages)
+
+
+class StageTracingMiddleware:
+    # Pure ASGI middleware: requests without the opt-in header are passed
+    # straight to the app with no extra task or buffering. Traced requests get
+    # their stage timings as a Server-Timing header on the response.
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(
+        self, scope: Dict[str, Any], receive: Callable, send: Callable
+    ) -> None:
+        if scope["type"] != "http" or (b"x-trace-stages", b"1") not in scope.get(
+            "headers", []
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        token, stages = start_trace()
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append(
+                    (b"server-timing", format_server_timing(stages).encode())
+                )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_trace(token)
@@ -0,0 +1,121 @@
+import hashlib
+from typing import BinaryIO, Dict, Optional
+from fastapi import HTTPException, Request
+from multipart.multipart import MultipartParser, parse_options_header
+
+# Allowance for multipart boundaries, part headers and small form fields on
+# top of the file itself when bounding the whole request body
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Upload exceeds maximum size of {max_size} bytes",
+    )
+
+
+class _FilePartWriter:
+    # python-multipart callbacks that hash and write the named file part as
+    # its bytes arrive and ignore every other part
+    def __init__(self, field_name: str, destination: BinaryIO, max_size: int):
+        self.field_name = field_name.encode()
+        self.destination = destination
+        self.max_size = max_size
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.found = False
+        self._in_file = False
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+
+    def callbacks(self) -> Dict[str, object]:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(
+            self._headers.get(b"content-disposition", b"")
+        )
+        self._in_file = not self.found and options.get(b"name") == self.field_name
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._in_file:
+            return
+        self.size += end - start
+        if self.size > self.max_size:
+            raise _too_large(self.max_size)
+        chunk = data[start:end]
+        self.digest.update(chunk)
+        self.destination.write(chunk)
+
+    def on_part_end(self) -> None:
+        if self._in_file:
+            self.found = True
+            self._in_file = False
+
+
+async def stream_upload(
+    request: Request,
+    field_name: str,
+    destination: BinaryIO,
+    max_size: int,
+) -> str:
+    # Parse the multipart body straight from the request stream, so the file
+    # is hashed and written once as it arrives and oversized uploads are
+    # rejected before they are read, or as soon as they cross the limit
+    max_body = max_size + MULTIPART_OVERHEAD
+    content_length: Optional[str] = request.headers.get("content-length")
+    if content_length is not None:
+        try:
+            declared = int(content_length)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Content-Length")
+        if declared > max_body:
+            raise _too_large(max_size)
+
+    content_type, options = parse_options_header(
+        request.headers.get("content-type", "")
+    )
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise HTTPException(
+            status_code=400, detail="Expected a multipart/form-data upload"
+        )
+
+    writer = _FilePartWriter(field_name, destination, max_size)
+    parser = MultipartParser(options[b"boundary"], writer.callbacks())
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_body:
+            raise _too_large(max_size)
+        parser.write(chunk)
+    parser.finalize()
+
+    if not writer.found:
+        raise HTTPException(
+            status_code=400, detail=f"Missing file field '{field_name}'"
+        )
+    return writer.digest.hexdigest()
@@ -1,7 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.api.endpoints import auth, moderation
+from app.api.endpoints import admin, auth, moderation
+from app.utils.tracing import StageTracingMiddleware
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -18,6 +19,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in per-request stage timings (X-Trace-Stages: 1)
+app.add_middleware(StageTracingMiddleware)
+
 # Include routers
 app.include_router(
     auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["authentication"]
@@ -27,6 +31,8 @@ app.include_router(
     moderation.router, prefix=f"{settings.API_V1_STR}/moderation", tags=["moderation"]
 )
 
+app.include_router(admin.router, prefix=f"{settings.API_V1_STR}/admin", tags=["admin"])
+
 
 @app.get("/")
 async def root():
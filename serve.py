@@ -0,0 +1,173 @@
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+
+import torch
+import uvicorn
+
+from app.core.config import settings
+from app.api.deps import get_moderator
+from app.utils.memory import memory_report, format_report
+from main import app
+
+logger = logging.getLogger("serve")
+
+
+# The Rust tokenizers thread pool is not fork safe either; tokenization in
+# the workers runs single threaded per request
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+# Intra-op thread count the workers restore after fork, see preload_models
+INTRA_OP_THREADS = torch.get_num_threads()
+
+
+def preload_models() -> None:
+    # Load and warm the pipelines once in the master so that every forked
+    # worker shares the weights copy-on-write instead of loading its own copy
+    moderator = get_moderator()
+
+    # Only PyTorch pipelines are preloaded: the TensorFlow runtime's thread
+    # pools do not survive fork and forked workers hang on their first call
+    for classifier in (
+        moderator.text_models.get(moderator.model_path),
+        moderator.image_classifier,
+    ):
+        if classifier.framework != "pt":
+            sys.exit(
+                f"serve.py requires PyTorch pipelines, {classifier.model.name_or_path} "
+                f"loaded with {classifier.framework}; run main.py instead"
+            )
+
+    # Warm up single threaded so no OpenMP worker threads exist at fork time;
+    # each worker restores the configured thread count for itself
+    torch.set_num_threads(1)
+    moderator.warmup()
+
+    # Move everything allocated so far into the permanent generation; the
+    # cyclic GC would otherwise touch these objects in each worker and
+    # unshare the pages holding them
+    gc.collect()
+    gc.freeze()
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def spawn_worker(sock: socket.socket) -> int:
+    pid = os.fork()
+    if pid != 0:
+        return pid
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    torch.set_num_threads(INTRA_OP_THREADS)
+    config = uvicorn.Config(app, host=settings.HOST, port=settings.PORT)
+    server = uvicorn.Server(config)
+    try:
+        server.run(sockets=[sock])
+    except Exception:
+        logger.exception("Worker pid=%d crashed", os.getpid())
+        os._exit(1)
+    os._exit(0)
+
+
+def log_memory(workers: Dict[int, int]) -> None:
+    logger.info("master pid=%d %s", os.getpid(), format_report(memory_report()))
+    for pid, index in sorted(workers.items(), key=lambda item: item[1]):
+        logger.info(
+            "worker %d pid=%d %s", index, pid, format_report(memory_report(pid))
+        )
+
+
+def run(num_workers: int) -> None:
+    logger.info("Preloading models in master pid=%d", os.getpid())
+    preload_models()
+    log_memory({})
+
+    sock = bind_socket(settings.HOST, settings.PORT)
+    workers: Dict[int, int] = {}
+    started: Dict[int, float] = {}
+    for index in range(num_workers):
+        workers[spawn_worker(sock)] = index
+        started[index] = time.monotonic()
+
+    # Crashed workers are respawned after a delay that doubles on every crash
+    # that happens soon after startup, so a worker failing on boot does not
+    # make the master fork in a tight loop
+    backoff: Dict[int, float] = {}
+    respawn_at: Dict[int, float] = {}
+    shutting_down = False
+
+    def handle_exit(signum, frame):
+        nonlocal shutting_down
+        shutting_down = True
+        respawn_at.clear()
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, handle_exit)
+    signal.signal(signal.SIGTERM, handle_exit)
+
+    last_report = time.monotonic()
+    while workers or respawn_at:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid, status = 0, 0
+
+        if pid == 0:
+            time.sleep(1)
+            now = time.monotonic()
+            for index, due in list(respawn_at.items()):
+                if due <= now:
+                    del respawn_at[index]
+                    workers[spawn_worker(sock)] = index
+                    started[index] = now
+            interval = settings.MEMORY_REPORT_INTERVAL
+            if interval > 0 and now - last_report >= interval:
+                log_memory(workers)
+                last_report = now
+            continue
+
+        index = workers.pop(pid, None)
+        if index is None or shutting_down:
+            continue
+
+        now = time.monotonic()
+        if now - started[index] >= settings.WORKER_RESPAWN_MAX_DELAY:
+            # The worker ran long enough to count as healthy
+            backoff.pop(index, None)
+        delay = backoff.get(index, 0.0)
+        backoff[index] = min(
+            max(delay * 2, settings.WORKER_RESPAWN_DELAY),
+            settings.WORKER_RESPAWN_MAX_DELAY,
+        )
+        logger.warning(
+            "Worker %d pid=%d exited with code %d, respawning in %.0fs",
+            index,
+            pid,
+            os.waitstatus_to_exitcode(status),
+            delay,
+        )
+        respawn_at[index] = now + delay
+
+    sock.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    num_workers = int(sys.argv[1]) if len(sys.argv) > 1 else settings.WORKERS
+    run(num_workers)